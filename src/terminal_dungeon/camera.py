@@ -1,5 +1,8 @@
 """The raycaster's camera."""
 
+import cmath
+import math
+
 import numpy as np
 from numpy.typing import NDArray
 
@@ -47,8 +50,8 @@ class Camera:
     @staticmethod
     def rotation_matrix(theta: float) -> NDArray[np.float32]:
         """Return a 2-D rotation matrix from a given angle."""
-        x = np.cos(theta)
-        y = np.sin(theta)
+        x = math.cos(theta)
+        y = math.sin(theta)
         return np.array([[x, y], [-y, x]], float)
 
     def _build_plane(self, theta: float, fov: float) -> None:
@@ -76,4 +79,7 @@ class Camera:
 
     def rotate(self, theta: float) -> None:
         """Rotate camera `theta` radians."""
-        self._plane = self._plane @ self.rotation_matrix(theta)
+        # Right-multiplying a row `(x, y)` by `rotation_matrix(theta)` is the same as
+        # multiplying `x + yi` by `e^(i * theta)`, so rotate both rows in-place as
+        # complex numbers.
+        self._plane.view(complex)[:] *= cmath.rect(1.0, theta)
@@ -3,9 +3,9 @@
 import curses
 import os
 import signal
-from collections import defaultdict
+import threading
 from dataclasses import dataclass
-from time import monotonic
+from time import monotonic, sleep
 
 import numpy as np
 from numpy.typing import NDArray
@@ -32,10 +32,37 @@ KEY_BINDINGS: dict[str, Key | KeyCode] = {
     "strafe_right": KeyCode(char="e"),
 }
 
-
-def _move_to(camera: Camera, game_map: NDArray[np.int64], pos: NDArray[np.float32]):
+# Each binding is assigned its own bit in the pressed-keys mask so that releasing one
+# of two keys bound to an action doesn't release the action.
+_KEY_BITS: dict[str, int] = {name: 1 << i for i, name in enumerate(KEY_BINDINGS)}
+_QUIT = _KEY_BITS["quit"]
+_TOGGLE_TEXTURE = _KEY_BITS["toggle_texture"]
+_FORWARD = _KEY_BITS["forward_1"] | _KEY_BITS["forward_2"]
+_BACKWARD = _KEY_BITS["backward_1"] | _KEY_BITS["backward_2"]
+_TURN_LEFT = _KEY_BITS["turn_left_1"] | _KEY_BITS["turn_left_2"]
+_TURN_RIGHT = _KEY_BITS["turn_right_1"] | _KEY_BITS["turn_right_2"]
+_STRAFE_LEFT = _KEY_BITS["strafe_left"]
+_STRAFE_RIGHT = _KEY_BITS["strafe_right"]
+
+# Actions that may change what is on screen.
+_REDRAW = (
+    _TOGGLE_TEXTURE
+    | _FORWARD
+    | _BACKWARD
+    | _TURN_LEFT
+    | _TURN_RIGHT
+    | _STRAFE_LEFT
+    | _STRAFE_RIGHT
+)
+
+# Seconds to sleep between polls when nothing on screen has changed.
+_IDLE_DELAY: float = 1 / 60
+
+
+def _move_by(camera: Camera, game_map: NDArray[np.uint8], dx: float, dy: float):
     old_x, old_y = camera.pos
-    x, y = pos.tolist()
+    x = old_x + dx
+    y = old_y + dy
     if game_map[int(x), int(y)] == 0:
         camera.pos = x, y
     elif game_map[int(x), int(old_y)] == 0:
@@ -52,13 +79,13 @@ class Engine:
     ----------
     camera : Camera
         The camera for the caster.
-    game_map : NDArray[np.uint64]
+    game_map : NDArray[np.uint8]
         A 2D integer numpy array with nonzero entries representing walls.
     sprites : list[Sprite]
         A list of sprites.
-    wall_textures : list[NDArray[np.uint64]]
+    wall_textures : list[NDArray[np.uint8]]
         A list of wall textures.
-    sprite_textures : list[NDArray[np.str_]]
+    sprite_textures : list[NDArray[np.uint8]]
         A list of sprite textures.
     rotation_speed : float, default: 3.0
         Speed with which the camera rotates.
@@ -68,13 +95,13 @@ class Engine:
 
     camera: Camera
     """The camera for the caster."""
-    game_map: NDArray[np.uint64]
+    game_map: NDArray[np.uint8]
     """A 2D integer numpy array with nonzero entries representing walls."""
     sprites: list[Sprite]
     """A list of sprites."""
-    wall_textures: list[NDArray[np.uint64]]
+    wall_textures: list[NDArray[np.uint8]]
     """A list of wall textures."""
-    sprite_textures: list[NDArray[np.str_]]
+    sprite_textures: list[NDArray[np.uint8]]
     """A list of sprite textures."""
     rotation_speed: float = 3.0
     """Speed with which the camera rotates."""
@@ -92,18 +119,32 @@ class Engine:
         screen.nodelay(True)
 
         camera = self.camera
-        strafe_rot = camera.rotation_matrix(3 * np.pi / 2)
         game_map = self.game_map
         caster = Raycaster(self)
         resized: bool = True
+        redraw: bool = True
+
+        key_bits: dict[Key | KeyCode, int] = {}
+        for name, key in KEY_BINDINGS.items():
+            key_bits[key] = key_bits.get(key, 0) | _KEY_BITS[name]
 
-        pressed_keys = defaultdict(bool)
+        # Pressed keys as a bitmask. Only the listener thread sets bits; the lock
+        # guards the read-modify-write updates against the render loop consuming the
+        # texture toggle.
+        pressed: int = 0
+        pressed_lock = threading.Lock()
 
         def on_press(key):
-            pressed_keys[key] = True
+            nonlocal pressed
+            if bit := key_bits.get(key):
+                with pressed_lock:
+                    pressed |= bit
 
         def on_release(key):
-            pressed_keys[key] = False
+            nonlocal pressed
+            if bit := key_bits.get(key):
+                with pressed_lock:
+                    pressed &= ~bit
 
         def set_resized(*args):
             nonlocal resized
@@ -128,66 +169,58 @@ class Engine:
                         curses.resizeterm(height, width)
                     caster.resize(width - 1, height)
                     resized = False
+                    redraw = True
 
-                caster.cast()
+                if redraw:
+                    caster.cast()
 
-                for row_num, row in enumerate(caster.buffer):
-                    screen.addstr(row_num, 0, "".join(row))
+                    # Rows are one column narrower than the screen, so the whole
+                    # frame can be written with a single call without wrapping.
+                    frame = b"\n".join(caster.buffer).decode("ascii")
+                    screen.addstr(0, 0, frame)
                     screen.refresh()
 
-                if pressed_keys[KEY_BINDINGS["quit"]]:
+                    redraw = False
+                else:
+                    sleep(_IDLE_DELAY)
+
+                with pressed_lock:
+                    keys = pressed
+                    pressed &= ~_TOGGLE_TEXTURE
+
+                if keys & _QUIT:
                     break
-                if pressed_keys[KEY_BINDINGS["toggle_texture"]]:
-                    pressed_keys[KEY_BINDINGS["toggle_texture"]] = False
+                if keys & _REDRAW:
+                    redraw = True
+                if keys & _TOGGLE_TEXTURE:
                     caster.toggle_textures()
 
-                left = (
-                    pressed_keys[KEY_BINDINGS["turn_left_1"]]
-                    or pressed_keys[KEY_BINDINGS["turn_left_2"]]
-                )
-                right = (
-                    pressed_keys[KEY_BINDINGS["turn_right_1"]]
-                    or pressed_keys[KEY_BINDINGS["turn_right_2"]]
-                )
-                forward = (
-                    pressed_keys[KEY_BINDINGS["forward_1"]]
-                    or pressed_keys[KEY_BINDINGS["forward_2"]]
-                )
-                backward = (
-                    pressed_keys[KEY_BINDINGS["backward_1"]]
-                    or pressed_keys[KEY_BINDINGS["backward_2"]]
-                )
-                strafe_left = pressed_keys[KEY_BINDINGS["strafe_left"]]
-                strafe_right = pressed_keys[KEY_BINDINGS["strafe_right"]]
+                left = keys & _TURN_LEFT
+                right = keys & _TURN_RIGHT
+                forward = keys & _FORWARD
+                backward = keys & _BACKWARD
+                strafe_left = keys & _STRAFE_LEFT
+                strafe_right = keys & _STRAFE_RIGHT
 
                 if left and not right:
                     camera.rotate(-self.rotation_speed * dt)
                 elif right and not left:
                     camera.rotate(self.rotation_speed * dt)
 
+                # Strafing moves perpendicular to the camera's direction, `(x, y)`
+                # rotated a quarter turn, which needs no rotation matrix.
+                dir_x, dir_y = camera._plane[0].tolist()
+                step = self.translation_speed * dt
+
                 if forward and not backward:
-                    next_pos = (
-                        self.translation_speed * dt * camera._plane[0] + camera.pos
-                    )
-                    _move_to(camera, game_map, next_pos)
+                    _move_by(camera, game_map, step * dir_x, step * dir_y)
                 elif backward and not forward:
-                    next_pos = (
-                        -self.translation_speed * dt * camera._plane[0] + camera.pos
-                    )
-                    _move_to(camera, game_map, next_pos)
+                    _move_by(camera, game_map, -step * dir_x, -step * dir_y)
 
                 if strafe_left and not strafe_right:
-                    next_pos = (
-                        self.translation_speed * dt * camera._plane[0] @ strafe_rot
-                        + camera.pos
-                    )
-                    _move_to(camera, game_map, next_pos)
+                    _move_by(camera, game_map, step * dir_y, -step * dir_x)
                 elif strafe_right and not strafe_left:
-                    next_pos = (
-                        self.translation_speed * dt * camera._plane[0] @ -strafe_rot
-                        + camera.pos
-                    )
-                    _move_to(camera, game_map, next_pos)
+                    _move_by(camera, game_map, -step * dir_y, step * dir_x)
 
         finally:
             listener.stop()
@@ -38,14 +38,45 @@ class Raycaster:
 
     def __post_init__(self) -> None:
         self._shades = len(self.ascii_map) - 1
-        self._shade_values = np.linspace(-12, 12, self._shades, dtype=int)
+        self._ascii_codes = np.frombuffer(
+            "".join(self.ascii_map).encode("ascii"), dtype=np.uint8
+        )
+        texture_shade = 12
+        shade_values = np.linspace(
+            -texture_shade, texture_shade, self._shades, dtype=np.int16
+        )
+        # Wall textures, with their values already mapped to shade offsets, stacked
+        # into a single bank indexed by map value. Smaller textures are padded to the
+        # largest size; index 0 is an unused 1x1 texture for empty cells.
+        wall_textures = self.engine.wall_textures
+        sizes = np.array([(1, 1)] + [tex.shape for tex in wall_textures])
+        self._wall_bank = np.zeros((len(sizes), *sizes.max(axis=0)), dtype=np.int16)
+        for i, tex in enumerate(wall_textures, start=1):
+            tex_w, tex_h = tex.shape
+            self._wall_bank[i, :tex_w, :tex_h] = shade_values[tex]
+        self._wall_widths, self._wall_heights = sizes.T
+        # Shades are stored offset by `texture_shade` so that darkened texels stay
+        # non-negative. This table removes the offset, clamps the shade to the range
+        # of `ascii_map` and maps it to its character code in a single lookup.
+        self._shade_offset = texture_shade
+        raw_shades = np.arange(self._shades + 2 * texture_shade + 1) - texture_shade
+        self._shade_codes = self._ascii_codes[np.clip(raw_shades, 1, self._shades)]
         self._side_shade = 2
         self._shade_dif = self._shades - self._side_shade
         self._textures_on = True
-        self._mini_map = np.where(self.engine.game_map.T, "#", " ")
+        # Map with a border of walls so that every ray stops inside it; map positions
+        # in `_cast_rays` are offset by one to account for the border.
+        self._game_map = np.pad(self.engine.game_map, 1, constant_values=1)
+        # Rays index the flattened map; a step along either axis moves a ray's cell
+        # index by that axis' stride.
+        self._flat_map = self._game_map.ravel()
+        self._map_strides = np.array([self._game_map.shape[1], 1])
+        self._mini_map = np.where(self.engine.game_map.T, ord("#"), ord(" ")).astype(
+            np.uint8
+        )
         # Buffers
-        self._pos_int = np.zeros((2,), dtype=int)
         self._pos_frac = np.zeros((2,), dtype=float)
+        self._sprite_relatives = np.zeros((len(self.engine.sprites), 2), dtype=float)
 
     @property
     def textures_on(self) -> bool:
@@ -62,8 +93,12 @@ class Raycaster:
         """Height of caster's buffer."""
         self.width = width
         """Width of caster's buffer."""
-        self.buffer = np.full((height, width), " ")
-        """The array in which the caster renders."""
+        self.buffer = np.full((height, width), ord(" "), dtype=np.uint8)
+        """The array of ASCII character codes in which the caster renders."""
+
+        # Empty ceiling and checkered floor that each frame starts from.
+        self._background = np.full_like(self.buffer, ord(" "))
+        self._background[height // 2 :, ::2] = self._ascii_codes[1]
 
         # Precalculate angle of rays cast.
         self._ray_angles = angles = np.ones((width, 2), dtype=float)
@@ -71,106 +106,170 @@ class Raycaster:
 
         # Buffers
         self._rotated_angles = np.zeros_like(angles)
+        self._inverse_angles = np.zeros_like(angles)
         self._deltas = np.zeros_like(angles)
         self._sides = np.zeros_like(angles)
         self._steps = np.zeros_like(angles, dtype=int)
-        self._weights = weights = np.zeros((height, 2), dtype=float)
-        self._tex_frac = np.zeros_like(weights)
-        self._tex_frac_2 = np.zeros_like(weights)
-        self._tex_int = np.zeros_like(weights, dtype=int)
+        self._cell_steps = np.zeros_like(angles, dtype=int)
+        self._cells = np.zeros((width,), dtype=int)
         self._column_distances = np.zeros((width,), dtype=float)
+        self._column_hits = np.zeros((width,), dtype=int)
+        self._column_sides = np.zeros((width,), dtype=int)
+        self._columns = np.arange(width)
+        self._rows = np.arange(height)[:, None]
+        self._shade_buffer = np.zeros((height, width), dtype=np.int16)
+        self._sprite_columns = np.zeros((width,), dtype=float)
+        self._sprite_rows = np.zeros((height,), dtype=float)
+        self._sprite_tex_xs = np.zeros((width,), dtype=int)
+        self._sprite_tex_ys = np.zeros((height,), dtype=int)
+        self._sprite_visible = np.zeros((width,), dtype=bool)
+        self._sprite_mask = np.zeros((height, width), dtype=bool)
+
+        minimap_width = round(self.minimap_width * width)
+        if minimap_width % 2 == 0:
+            minimap_width += 1
+
+        minimap_height = round(self.minimap_height * height)
+        if minimap_height % 2 == 0:
+            minimap_height += 1
+
+        # The minimap is padded so that the window centered on any cell of the map
+        # can be sliced out directly.
+        self._minimap_size = minimap_height, minimap_width
+        self._padded_minimap = np.pad(
+            self._mini_map,
+            ((minimap_height // 2,) * 2, (minimap_width // 2,) * 2),
+            constant_values=ord(" "),
+        )
 
     def cast(self) -> None:
         """Cast rays and sprites and render minimap into buffer."""
-        self.buffer[:] = " "
-        self.buffer[self.height // 2 :, ::2] = self.ascii_map[1]
+        self.buffer[:] = self._background
 
         # Early calculations on rays can be vectorized:
         np.dot(self._ray_angles, self.engine.camera._plane, out=self._rotated_angles)
         with np.errstate(divide="ignore"):
-            np.true_divide(1.0, self._rotated_angles, out=self._deltas)
-        np.absolute(self._deltas, out=self._deltas)
-        np.sign(self._rotated_angles, out=self._steps, casting="unsafe")
-        np.heaviside(self._steps, 1.0, out=self._sides)
+            np.true_divide(1.0, self._rotated_angles, out=self._inverse_angles)
+        np.absolute(self._inverse_angles, out=self._deltas)
+        # Rays step by +/-1 per hop; a zero component still steps so it never stalls.
+        np.copysign(1, self._rotated_angles, out=self._steps, casting="unsafe")
+        np.greater(self._steps, 0, out=self._sides)
         np.mod(self.engine.camera.pos, 1.0, out=self._pos_frac)
         np.subtract(self._sides, self._pos_frac, out=self._sides)
         np.multiply(self._sides, self._steps, out=self._sides)
         np.multiply(self._sides, self._deltas, out=self._sides)
 
-        for column in range(self.width):
-            self._cast_ray(column)
+        self._cast_rays()
+        self._draw_walls()
         self._cast_sprites()
         self._render_minimap()
 
-    def _cast_ray(self, column: int) -> None:
-        camera = self.engine.camera
-        camera_pos = camera.pos
-        game_map = self.engine.game_map
-
-        ray_pos = self._pos_int
-        ray_pos[:] = camera_pos
-        ray_angle = self._rotated_angles[column]
-        delta = self._deltas[column]
-        step = self._steps[column]
-        sides = self._sides[column]
-
-        # Cast a ray until we hit a wall or hit max_hops
+    def _cast_rays(self) -> None:
+        camera_pos = self.engine.camera.pos
+        flat_map = self._flat_map
+        map_width = self._map_strides[0]
+        columns = self._columns
+        x, y = camera_pos
+        cells = self._cells
+        cells.fill((int(x) + 1) * map_width + int(y) + 1)
+        sides = self._sides
+        deltas = self._deltas
+        steps = self._steps
+        cell_steps = self._cell_steps
+        np.multiply(steps, self._map_strides, out=cell_steps)
+        hits = self._column_hits
+        hits.fill(0)
+        hit_sides = self._column_sides
+
+        # Step every ray that hasn't hit a wall at once, until all rays hit a wall or
+        # max_hops is reached.
+        rays = columns
         for _ in range(self.max_hops):
-            side = 0 if sides[0] < sides[1] else 1
-            sides[side] += delta[side]
-            ray_pos[side] += step[side]
-
-            if texture_index := game_map[tuple(ray_pos)]:
-                distance = (
-                    ray_pos[side] - camera_pos[side] + (0 if step[side] == 1 else 1)
-                ) / ray_angle[side]
+            side = np.where(sides[rays, 0] < sides[rays, 1], 0, 1)
+            sides[rays, side] += deltas[rays, side]
+            cells[rays] += cell_steps[rays, side]
+
+            walls = flat_map[cells[rays]]
+            hit = walls != 0
+            hits[rays[hit]] = walls[hit]
+            hit_sides[rays[hit]] = side[hit]
+            rays = rays[~hit]
+            if rays.size == 0:
                 break
-        else:  # No walls in range
-            distance = 10000
-            return
-
-        self._column_distances[column] = distance
 
+        # Rays with no walls in range don't occlude sprites.
+        self._column_distances.fill(np.inf)
+        hit_columns = columns[hits != 0]
+        side = hit_sides[hit_columns]
+        map_x, map_y = np.divmod(cells[hit_columns], map_width)
+        self._column_distances[hit_columns] = (
+            np.where(side, map_y, map_x)
+            - np.take(camera_pos, side)
+            - (steps[hit_columns, side] == 1)
+        ) * self._inverse_angles[hit_columns, side]
+
+    def _draw_walls(self) -> None:
         h = self.height
-        column_height = int(h / distance) if distance else 10000
-        if column_height == 0:
-            return  # Draw nothing
+        camera_pos = self.engine.camera.pos
+        columns = self._columns
+        distances = self._column_distances
+        sides = self._column_sides
 
-        half_height = h // 2
-        half_column = column_height // 2
-        if half_column > half_height:
-            half_column = half_height
-
-        start = half_height - half_column
-        end = half_height + half_column
-        drawn_height = end - start
-
-        shade = min(drawn_height, self._shade_dif)
-        if side:
-            shade += self._side_shade
+        # Columns whose rays hit nothing have infinite distance and a height of 0.
+        with np.errstate(divide="ignore"):
+            column_heights = np.where(distances, h / distances, 10000).astype(int)
 
-        shade_buffer = np.full(drawn_height, shade)
+        half_height = h // 2
+        half_columns = np.minimum(column_heights // 2, half_height)
+        starts = half_height - half_columns
+        ends = half_height + half_columns
+        drawn_heights = ends - starts
+
+        # Walls are centered vertically, so only the rows spanned by the tallest
+        # column need to be shaded.
+        top = starts.min()
+        bottom = ends.max()
+        rows = self._rows[top:bottom]
+        shade_buffer = self._shade_buffer[top:bottom]
+        shade_buffer[:] = np.minimum(drawn_heights, self._shade_dif)
+        shade_buffer += self._side_shade * sides + self._shade_offset
 
         if self.textures_on:
-            tex = self.engine.wall_textures[texture_index - 1]
-            tex_w, tex_h = tex.shape
-
-            wall_x = (camera_pos[1 - side] + distance * ray_angle[1 - side]) % 1
-            tex_x = int(wall_x * tex_w)
-            if (-1 if side == 1 else 1) * ray_angle[side] < 0:
-                tex_x = tex_w - tex_x - 1
-
+            hits = self._column_hits
+            ray_angles = self._rotated_angles
+            # Columns with a wall in view that has a texture.
+            tex_columns = columns[(drawn_heights > 0) & (hits < len(self._wall_bank))]
+            tex_indices = hits[tex_columns]
+            tex_w = self._wall_widths[tex_indices]
+            tex_h = self._wall_heights[tex_indices]
+            side = sides[tex_columns]
+            other_side = 1 - side
+
+            wall_x = (
+                np.take(camera_pos, other_side)
+                + distances[tex_columns] * ray_angles[tex_columns, other_side]
+            ) % 1
+            tex_xs = (wall_x * tex_w).astype(int)
+            flip = np.where(side, -1, 1) * ray_angles[tex_columns, side] < 0
+            tex_xs[flip] = tex_w[flip] - tex_xs[flip] - 1
+
+            column_height = column_heights[tex_columns]
+            drawn_height = drawn_heights[tex_columns]
             offset = (column_height - drawn_height) / 2
             ratio = tex_h / column_height
             tex_start = offset * ratio
             tex_end = (offset + drawn_height) * ratio
-            tex_ys = np.linspace(
-                tex_start, tex_end, num=drawn_height, endpoint=False, dtype=int
-            )
-            shade_buffer += self._shade_values[tex[tex_x, tex_ys]]
-            np.clip(shade_buffer, 1, self._shades, out=shade_buffer)
-
-        self.buffer[start:end, column] = self.ascii_map[shade_buffer]
+            tex_step = (tex_end - tex_start) / drawn_height
+            tex_ys = (rows - starts[tex_columns]) * tex_step + tex_start
+            tex_ys = tex_ys.astype(int)
+            np.clip(tex_ys, 0, tex_h - 1, out=tex_ys)
+            shade_buffer[:, tex_columns] += self._wall_bank[tex_indices, tex_xs, tex_ys]
+
+        np.copyto(
+            self.buffer[top:bottom],
+            self._shade_codes[shade_buffer],
+            where=(rows >= starts) & (rows < ends),
+        )
 
     def _cast_sprites(self) -> None:
         h = self.height
@@ -179,97 +278,99 @@ class Raycaster:
         sprites = self.engine.sprites
         sprite_textures = self.engine.sprite_textures
         column_distances = self._column_distances
+        columns = self._columns
+        screen_rows = self._rows[:, 0]
+        buffer = self.buffer
+
+        if not sprites:
+            return
 
-        for sprite in sprites:
-            sprite.relative = -sprite.pos + camera.pos
-        sprites.sort()
-
-        # Camera Inverse used to calculate transformed position of sprites.
-        cam_inv = np.linalg.inv(-camera._plane[::-1])
-
-        # Draw each sprite from furthest to closest.
-        for sprite in sprites:
-            # Transformed position of sprites due to camera position.
-            x, y = sprite.relative @ cam_inv
-
-            # If sprite is behind camera, don't draw it.
-            if y <= 0:
-                continue
-
-            # Sprite x-position on screen.
-            sprite_x = int(w / 2 * (1 + x / y))
-            sprite_height = int(h / y)
-            sprite_width = int(w / y / 2)
-            # Is sprite too small?
-            if sprite_height == 0 or sprite_width == 0:
-                continue
-            tex = sprite_textures[sprite.texture_index]
+        relatives = self._sprite_relatives
+        if len(relatives) != len(sprites):
+            # Sprites may be added to or removed from the engine at any time.
+            relatives = self._sprite_relatives = np.zeros((len(sprites), 2))
+        np.stack([sprite.pos for sprite in sprites], out=relatives)
+        np.subtract(camera.pos, relatives, out=relatives)
+
+        # Camera inverse used to calculate transformed position of sprites. This is
+        # the inverse of `-camera._plane[::-1]`, written out for the 2x2 case.
+        (a, b), (c, d) = camera._plane.tolist()
+        inv_det = 1.0 / (b * c - a * d)
+        cam_inv = np.array([[-b * inv_det, d * inv_det], [a * inv_det, -c * inv_det]])
+
+        # Transformed position of sprites due to camera position.
+        transformed = relatives @ cam_inv
+        depths = transformed[:, 1]
+
+        # Sprites behind the camera or behind every wall aren't drawn.
+        candidates = np.flatnonzero((depths > 0) & (depths <= column_distances.max()))
+        ys = depths[candidates]
+        sprite_xs = (w / 2 * (1 + transformed[candidates, 0] / ys)).astype(int)
+        sprite_heights = (h / ys).astype(int)
+        sprite_widths = (w / ys / 2).astype(int)
+        lefts = -sprite_widths // 2 + sprite_xs
+        rights = sprite_widths // 2 + sprite_xs
+
+        # Nor are sprites too small to see or entirely off screen. The rest are drawn
+        # from furthest to closest depth.
+        on_screen = np.flatnonzero(
+            (sprite_heights > 0) & (sprite_widths > 0) & (rights > 0) & (lefts < w)
+        )
+        order = on_screen[np.argsort(-ys[on_screen], kind="stable")]
+
+        for i, y, sprite_x, sprite_height, sprite_width, left, right in zip(
+            candidates[order].tolist(),
+            ys[order].tolist(),
+            sprite_xs[order].tolist(),
+            sprite_heights[order].tolist(),
+            sprite_widths[order].tolist(),
+            lefts[order].tolist(),
+            rights[order].tolist(),
+        ):
+            tex = sprite_textures[sprites[i].texture_index]
             tex_width, tex_height = tex.shape
 
-            start_x = _clamp(0, -sprite_width // 2 + sprite_x, w)
-            end_x = _clamp(0, sprite_width // 2 + sprite_x, w)
-            columns = np.arange(start_x, end_x)
-            columns = columns[y <= column_distances[columns]]
+            start_x = _clamp(0, left, w)
+            end_x = _clamp(0, right, w)
+            n_columns = end_x - start_x
+            # Columns where the sprite is in front of the walls.
+            visible = self._sprite_visible[:n_columns]
+            np.less_equal(y, column_distances[start_x:end_x], out=visible)
             clip_x = sprite_x - sprite_width / 2
-            tex_xs = columns - clip_x
-            tex_xs *= tex_width / sprite_width
+            sprite_columns = self._sprite_columns[:n_columns]
+            np.subtract(columns[start_x:end_x], clip_x, out=sprite_columns)
+            tex_xs = self._sprite_tex_xs[:n_columns]
+            np.multiply(
+                sprite_columns, tex_width / sprite_width, out=tex_xs, casting="unsafe"
+            )
 
             start_y = _clamp(0, int((h - sprite_height) / 2), h)
             end_y = _clamp(0, int((h + sprite_height) / 2), h)
-            rows = np.arange(start_y, end_y, dtype=float)
+            n_rows = end_y - start_y
             clip_y = (sprite_height - h) / 2
-            rows += clip_y
-            rows *= tex_height / sprite_height
-            np.clip(rows, 0, None, out=rows)
-
-            tex_rect = tex[tex_xs.astype(int)][:, rows.astype(int)].T
-            self.buffer[start_y:end_y, columns] = np.where(
-                tex_rect != "0", tex_rect, self.buffer[start_y:end_y, columns]
+            sprite_rows = self._sprite_rows[:n_rows]
+            np.add(screen_rows[start_y:end_y], clip_y, out=sprite_rows)
+            tex_ys = self._sprite_tex_ys[:n_rows]
+            np.multiply(
+                sprite_rows, tex_height / sprite_height, out=tex_ys, casting="unsafe"
             )
+            np.maximum(tex_ys, 0, out=tex_ys)
 
-    def _render_minimap(self) -> None:
-        dst_width = round(self.minimap_width * self.width)
-        if dst_width % 2 == 0:
-            dst_width += 1
-
-        dst_height = round(self.minimap_height * self.height)
-        if dst_height % 2 == 0:
-            dst_height += 1
+            tex_rect = tex[tex_xs, tex_ys[:, None]]
+            mask = self._sprite_mask[:n_rows, :n_columns]
+            np.not_equal(tex_rect, ord("0"), out=mask)
+            mask &= visible
+            np.copyto(buffer[start_y:end_y, start_x:end_x], tex_rect, where=mask)
 
-        display = np.full((dst_height, dst_width), " ")
+    def _render_minimap(self) -> None:
+        height, width = self._minimap_size
         x, y = self.engine.camera.pos
-        dst_x = int(x) - dst_width // 2
-        dst_y = int(y) - dst_height // 2
-        if dst_x < 0:
-            src_l = 0
-            dst_l = -dst_x
-        else:
-            src_l = dst_x
-            dst_l = 0
-
-        if dst_y < 0:
-            src_t = 0
-            dst_t = -dst_y
-        else:
-            src_t = dst_y
-            dst_t = 0
-
-        src_height, src_width = self._mini_map.shape
-        if dst_x + dst_width >= src_width:
-            src_r = src_width
-            dst_r = src_width - dst_x
-        else:
-            src_r = dst_x + dst_width
-            dst_r = dst_width
-
-        if dst_y + dst_height >= src_height:
-            src_b = src_height
-            dst_b = src_height - dst_y
-        else:
-            src_b = dst_y + dst_height
-            dst_b = dst_height
-
-        display[dst_t:dst_b, dst_l:dst_r] = self._mini_map[src_t:src_b, src_l:src_r]
-        display[dst_height // 2, dst_width // 2] = "@"
+        x = int(x)
+        y = int(y)
         u, v = self.minimap_pos
-        self.buffer[-dst_height - v : -v, -dst_width - u : -u] = display
+        minimap = self.buffer[-height - v : -v, -width - u : -u]
+        if minimap.shape != (height, width):
+            # Buffer is too small to fit the minimap.
+            return
+        minimap[:] = self._padded_minimap[y : y + height, x : x + width]
+        minimap[height // 2, width // 2] = ord("@")
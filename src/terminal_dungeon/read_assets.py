@@ -23,7 +23,23 @@ from numpy.typing import NDArray
 __all__ = ["read_map", "read_wall_textures", "read_sprite_textures", "Sprite"]
 
 
-def read_map(path: Path) -> NDArray[np.uint32]:
+def _read_ascii(path: Path) -> NDArray[np.uint8]:
+    """Read a rectangular ascii text file into a 2D array of character codes."""
+    lines = path.read_text().encode("ascii").splitlines()
+    if not lines or len({len(line) for line in lines}) != 1:
+        raise ValueError(f"{path} is not a rectangular block of text.")
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(len(lines), -1)
+
+
+def _read_digits(path: Path) -> NDArray[np.uint8]:
+    """Read a rectangular text file of digits into a 2D array (rows by columns)."""
+    digits = _read_ascii(path) - ord("0")
+    if not (digits <= 9).all():
+        raise ValueError(f"{path} contains characters that are not digits.")
+    return digits
+
+
+def read_map(path: Path) -> NDArray[np.uint8]:
     """Read a map from a text file.
 
     Parameters
@@ -33,16 +49,13 @@ def read_map(path: Path) -> NDArray[np.uint32]:
 
     Returns
     -------
-    NDArray[np.uint32]
+    NDArray[np.uint8]
         A 2D integer numpy array with nonzero entries representing walls.
     """
-    text = path.read_text()
-    return np.array(
-        [[int(cell) for cell in line] for line in text.splitlines()], dtype=np.uint32
-    ).T
+    return np.ascontiguousarray(_read_digits(path).T)
 
 
-def read_wall_textures(*paths: Path) -> list[NDArray[np.int32]]:
+def read_wall_textures(*paths: Path) -> list[NDArray[np.uint8]]:
     r"""Read wall textures from text files.
 
     Wall textures are arrays of digits with low digits representing darker
@@ -55,22 +68,17 @@ def read_wall_textures(*paths: Path) -> list[NDArray[np.int32]]:
 
     Returns
     -------
-    list[NDArray[np.int32]]
+    list[NDArray[np.uint8]]
         A list of wall textures.
     """
+    return [np.ascontiguousarray(_read_digits(path).T) for path in paths]
 
-    def _read_wall(path):
-        text = path.read_text()
-        return np.array([[int(cell) for cell in line] for line in text.splitlines()]).T
 
-    return [_read_wall(path) for path in paths]
-
-
-def read_sprite_textures(*paths: Path) -> list[NDArray[np.str_]]:
+def read_sprite_textures(*paths: Path) -> list[NDArray[np.uint8]]:
     r"""Read sprite textures from text files.
 
-    Sprite textures can be any text with the caveat that "0" represents a transparent
-    character.
+    Sprite textures can be any ascii text with the caveat that "0" represents a
+    transparent character.
 
     Parameters
     ----------
@@ -79,15 +87,10 @@ def read_sprite_textures(*paths: Path) -> list[NDArray[np.str_]]:
 
     Returns
     -------
-    list[NDArray[np.str_]]
-        A list of sprite textures.
+    list[NDArray[np.uint8]]
+        A list of sprite textures as ascii character codes.
     """
-
-    def _read_sprite(path):
-        text = path.read_text()
-        return np.array([list(line) for line in text.splitlines()]).T
-
-    return [_read_sprite(path) for path in paths]
+    return [np.ascontiguousarray(_read_ascii(path).T) for path in paths]
 
 
 @dataclass
@@ -109,24 +112,6 @@ class Sprite:
 
     def __post_init__(self) -> None:
         self.pos = np.asarray(self.pos)
-        self._relative: NDArray[np.float32] = np.zeros(2)
-        """Relative distance from camera."""
-        self.distance: np.float32 = 0.0
-        """Distance from camera."""
-
-    @property
-    def relative(self) -> NDArray[np.float32]:
-        """Relative distance from camera."""
-        return self._relative
-
-    @relative.setter
-    def relative(self, relative: NDArray[np.float32]):
-        self._relative = relative
-        self.distance = relative @ relative
-
-    def __lt__(self, other) -> bool:
-        """Sprites are ordered by their distance to camera."""
-        return self.distance > other.distance
 
     @classmethod
     def iter_from_json(cls, path: Path) -> Iterator["Sprite"]: